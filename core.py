@@ -0,0 +1,340 @@
+# core.py
+
+"""Shared core of the Dockerfile generator.
+
+Holds the request model, prompt construction, the exact-match and semantic
+caches, the optional micro-batching layer, and the `make_app` factory that
+wires them around a provider backend from `backends`. Keeping one copy of
+all of this means one compiled pydantic schema, one warm client, and one set
+of caches regardless of which backend serves the requests.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+
+import orjson
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+from typing import Annotated, Optional
+
+from backends import get_backend
+from prompt import build_prompt
+
+logger = logging.getLogger("dfgen")
+
+# --- Pydantic Models ---
+# Field constraints reject oversized or malformed inputs in pydantic-core
+# before they can inflate the prompt (and the per-token bill) or pollute the
+# caches. Names are short identifiers; commands and image refs get more room.
+_Name = Annotated[str, StringConstraints(min_length=1, max_length=32, pattern=r"^[A-Za-z0-9_+\-]+$")]
+_FileName = Annotated[str, StringConstraints(min_length=1, max_length=128)]
+_Command = Annotated[str, StringConstraints(min_length=1, max_length=512)]
+_ImageRef = Annotated[str, StringConstraints(min_length=1, max_length=128)]
+
+# This defines the structure of the incoming request body.
+class DockerfileRequest(BaseModel):
+    # Reject unknown fields in pydantic-core before any handler work runs.
+    model_config = ConfigDict(extra="forbid")
+
+    language: _Name
+    package_manager: _Name
+    dependency_file: _FileName
+    port: Annotated[int, Field(ge=1, le=65535)]
+    start_command: _Command
+    build_command: Optional[_Command] = None
+    base_image: Optional[_ImageRef] = None
+
+# --- Prompt Engineering ---
+# The string assembly lives in prompt.py, which takes only primitives so it
+# can optionally be mypyc-compiled (see that module's docstring).
+def create_prompt(request: DockerfileRequest) -> str:
+    """Creates a detailed, best-practice prompt for the model."""
+    return build_prompt(
+        request.language,
+        request.package_manager,
+        request.dependency_file,
+        request.port,
+        request.start_command,
+        request.build_command,
+        request.base_image,
+    )
+
+# --- Exact-Match Response Cache ---
+# Identical requests yield (near-)identical Dockerfiles, so cache generated
+# output keyed by the request fields and turn repeat calls into a dict lookup
+# instead of a multi-second model invocation. A plain LRU over an OrderedDict
+# is used because functools.lru_cache cannot wrap the async model call.
+_CACHE_MAX_SIZE = 1024
+_response_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_response_cache_lock = asyncio.Lock()
+
+def _cache_key(request: DockerfileRequest) -> tuple:
+    """Canonical, hashable key covering every field that shapes the prompt."""
+    return (
+        request.language,
+        request.package_manager,
+        request.dependency_file,
+        request.port,
+        request.start_command,
+        request.build_command,
+        request.base_image,
+    )
+
+async def _cache_get(key: tuple) -> Optional[str]:
+    async with _response_cache_lock:
+        dockerfile = _response_cache.get(key)
+        if dockerfile is not None:
+            _response_cache.move_to_end(key)
+        return dockerfile
+
+async def _cache_put(key: tuple, dockerfile: str) -> None:
+    async with _response_cache_lock:
+        _response_cache[key] = dockerfile
+        _response_cache.move_to_end(key)
+        if len(_response_cache) > _CACHE_MAX_SIZE:
+            _response_cache.popitem(last=False)
+
+# --- Semantic Cache (optional) ---
+# Catches near-duplicate requests that miss the exact-match cache, e.g. the
+# same stack on a different port. Enabled by installing the optional
+# dependencies (sentence-transformers, faiss-cpu); disabled otherwise.
+try:
+    from semantic_cache import SemanticCache
+    # Share the exact-match cache's cap so both layers retain the same
+    # number of generations.
+    _semantic_cache = SemanticCache(max_entries=_CACHE_MAX_SIZE)
+except ImportError:
+    _semantic_cache = None
+_semantic_cache_lock = asyncio.Lock()
+
+async def _remember(key: tuple, prompt: str, dockerfile: str) -> None:
+    """Stores a finished generation in both caches."""
+    await _cache_put(key, dockerfile)
+    if _semantic_cache is not None:
+        async with _semantic_cache_lock:
+            await asyncio.to_thread(_semantic_cache.put, prompt, key, dockerfile)
+
+# --- Request Micro-Batching (optional) ---
+# Under load, coalesce requests that arrive within a short window into one
+# model invocation with delimited sub-prompts, then split the answer back per
+# request. This amortizes per-call overhead at the cost of streaming, so it
+# is gated behind BATCH_GENERATION=1; an idle queue falls back to a plain
+# per-request call.
+BATCH_GENERATION = os.environ.get("BATCH_GENERATION", "").lower() in ("1", "true", "yes")
+_BATCH_WINDOW_SECONDS = 0.02
+_BATCH_MAX_SIZE = 8
+_BATCH_PREAMBLE = (
+    "You will receive several independent Dockerfile generation requests, each "
+    "introduced by a line of the form `---REQ N---`. Answer every request, in "
+    "order, introducing each answer with a matching line `---RESP N---`. Apply "
+    "the instructions inside each request only to that request.\n\n"
+)
+
+def _split_batch_response(text: str, size: int) -> list:
+    """Splits a `---RESP N---`-delimited answer back into per-request texts."""
+    pieces = re.split(r"---RESP (\d+)---", text)
+    answers = [None] * size
+    # re.split yields [prefix, "1", text1, "2", text2, ...].
+    for number, answer in zip(pieces[1::2], pieces[2::2]):
+        index = int(number) - 1
+        if 0 <= index < size:
+            answers[index] = answer.strip()
+    if any(answer is None for answer in answers):
+        raise RuntimeError("Batched response was missing one or more answers")
+    return answers
+
+class BatchDispatcher:
+    """Coalesces prompts from a short window into one backend call."""
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._queue: "asyncio.Queue[tuple]" = asyncio.Queue()
+
+    def start(self) -> None:
+        asyncio.create_task(self._worker())
+
+    async def submit(self, prompt: str) -> str:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((prompt, future))
+        return await future
+
+    async def _worker(self) -> None:
+        """Drains the queue in small windows and resolves each pending future."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + _BATCH_WINDOW_SECONDS
+            while len(batch) < _BATCH_MAX_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                if len(batch) == 1:
+                    # Nothing to coalesce with; a plain call avoids the
+                    # delimiter overhead and parsing risk.
+                    prompt, future = batch[0]
+                    results = [await self._backend.generate(prompt)]
+                else:
+                    combined = _BATCH_PREAMBLE + "".join(
+                        f"---REQ {n}---\n{prompt}\n" for n, (prompt, _) in enumerate(batch, 1)
+                    )
+                    results = _split_batch_response(
+                        await self._backend.generate(combined), len(batch)
+                    )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), dockerfile in zip(batch, results):
+                if not future.done():
+                    future.set_result(dockerfile)
+
+# --- HTTP Caching ---
+# With temperature=0 the generated Dockerfile is a pure function of the
+# prompt, so responses are content-addressable: an ETag derived from the
+# prompt lets CDNs and reverse proxies serve repeats without touching the
+# app at all, and If-None-Match turns revalidations into bodyless 304s.
+_CACHE_CONTROL = "public, max-age=86400"
+
+def _etag(prompt: str) -> str:
+    # RFC 9110 entity-tags are quoted strings; conforming clients echo the
+    # quotes back in If-None-Match, so we must emit them.
+    return f'"{hashlib.sha256(prompt.encode()).hexdigest()}"'
+
+def _cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+
+def _if_none_match_matches(header: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header matches the entity-tag (RFC 9110)."""
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses weak comparison: a W/ prefix is ignored.
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+# --- FastAPI Application Factory ---
+# The root response never changes, so serialize it once at import time
+# instead of rebuilding and re-encoding the same dict on every request.
+_ROOT_BYTES = orjson.dumps({"message": "Dockerfile Generator API is running!"})
+
+def make_app(backend_name: str) -> FastAPI:
+    """Builds the FastAPI app around the named provider backend.
+
+    Handlers return Response/StreamingResponse objects directly and never
+    declare response_model, which keeps FastAPI's jsonable_encoder and
+    per-field validation entirely off the hot path; the ORJSONResponse
+    default only backstops anything that slips through as a plain dict.
+    """
+    backend = get_backend(backend_name)
+    dispatcher = BatchDispatcher(backend) if BATCH_GENERATION else None
+
+    # Serialize all responses with orjson; much faster than the stdlib json
+    # encoder for the multi-kilobyte Dockerfile strings we return.
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.on_event("startup")
+    async def _start_batch_worker():
+        if dispatcher is not None:
+            dispatcher.start()
+
+    @app.on_event("shutdown")
+    async def _close_backend():
+        # Backends holding network resources (e.g. the Gemini connection
+        # pool) expose aclose; the mock backend has nothing to release.
+        aclose = getattr(backend, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    @app.post("/generate")
+    async def generate_dockerfile(request: DockerfileRequest, raw_request: Request):
+        """
+        Receives application details, generates a prompt, calls the model
+        backend, and streams back the generated Dockerfile as plain text.
+        """
+        # model_dump_json serializes in pydantic-core (Rust) without building
+        # an intermediate dict; the level check keeps INFO runs from paying
+        # for it.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received request: %s", request.model_dump_json())
+
+        key = _cache_key(request)
+        prompt = create_prompt(request)
+        logger.debug("Generated prompt:\n%s", prompt)
+
+        # If the caller (or an edge cache) already holds this exact
+        # Dockerfile, confirm with a bodyless 304.
+        etag = _etag(prompt)
+        headers = _cache_headers(etag)
+        if _if_none_match_matches(raw_request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        # Serve repeats straight from the in-process cache.
+        cached = await _cache_get(key)
+        if cached is not None:
+            return Response(content=cached, media_type="text/plain", headers=headers)
+
+        try:
+            # Check the semantic cache for a near-duplicate prompt before
+            # paying for a generation. Embedding is CPU work, so run it off
+            # the loop.
+            if _semantic_cache is not None:
+                async with _semantic_cache_lock:
+                    similar = await asyncio.to_thread(_semantic_cache.get, prompt, key)
+                if similar is not None:
+                    await _cache_put(key, similar)
+                    return Response(content=similar, media_type="text/plain", headers=headers)
+
+            # When batching is enabled, hand the prompt to the background
+            # worker and wait for our slice of the coalesced generation.
+            if dispatcher is not None:
+                dockerfile_content = await dispatcher.submit(prompt)
+                await _remember(key, prompt, dockerfile_content)
+                return Response(content=dockerfile_content, media_type="text/plain", headers=headers)
+
+            # Start a streaming generation so the client sees the first
+            # tokens at first-token latency instead of waiting for the whole
+            # Dockerfile to be generated.
+            chunk_iterator = await backend.stream(prompt)
+
+        except Exception:
+            # Handle potential errors from the API call
+            logger.exception("Dockerfile generation failed")
+            raise HTTPException(status_code=500, detail="Failed to generate Dockerfile from the AI model.")
+
+        # Forward chunks to the client as they arrive, accumulating them so
+        # the finished Dockerfile can be stored in the caches.
+        async def stream_dockerfile():
+            chunks = []
+            async for text in chunk_iterator:
+                chunks.append(text)
+                yield text.encode()
+            dockerfile_content = "".join(chunks)
+            if dockerfile_content:
+                await _remember(key, prompt, dockerfile_content)
+
+        return StreamingResponse(stream_dockerfile(), media_type="text/plain", headers=headers)
+
+    @app.get("/")
+    def read_root():
+        return Response(content=_ROOT_BYTES, media_type="application/json")
+
+    return app
@@ -0,0 +1,9 @@
+# gunicorn.conf.py
+
+import multiprocessing
+
+# UvicornWorker picks up uvloop and httptools automatically when they are
+# installed, replacing the pure-Python event loop and HTTP parser.
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = 2 * multiprocessing.cpu_count() + 1
+bind = "0.0.0.0:8000"
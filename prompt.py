@@ -0,0 +1,72 @@
+# prompt.py
+
+"""Prompt construction for the Dockerfile generator.
+
+Deliberately free of framework types: `build_prompt` takes only primitives,
+so this module can be compiled to a C extension with mypyc for steady-state
+CPU savings once the caches turn most requests into local work:
+
+    pip install 'mypy[mypyc]'
+    mypyc prompt.py
+
+The interpreted module behaves identically when no compiled extension is
+present.
+"""
+
+from typing import List, Optional
+
+# Both halves of the prompt are module-level constants: the header is a
+# template filled per request, the footer is fully static. Neither literal is
+# rebuilt on a call.
+_PROMPT_HEADER_TMPL = (
+    "Generate a secure, production-ready, multi-stage Dockerfile for a "
+    "**{language}** application using **{package_manager}**.\n\n"
+    "**Application Details:**\n"
+    "- The dependency file is named `{dependency_file}`.\n"
+    "- The application runs on and exposes port `{port}`.\n"
+    "- The command to start the application is `{start_command}`.\n"
+)
+_PROMPT_FOOTER = (
+    "\n**Instructions & Best Practices to Follow:**\n"
+    "- Use multi-stage builds. The first stage should build dependencies, and the final stage should be a lean image with only the production code and necessary dependencies.\n"
+    "- Do not run as the `root` user. Create a non-root user (e.g., 'appuser') and switch to it.\n"
+    "- Use a `.dockerignore` file (provide an example of what it should contain in a comment).\n"
+    "- Leverage Docker layer caching by copying dependency files and installing packages before copying the rest of the source code.\n"
+    "- Ensure all permissions are set correctly for the non-root user.\n"
+    "- The final output should be only the raw Dockerfile content, without any explanations or markdown formatting like ```dockerfile."
+)
+
+
+def build_prompt(
+    language: str,
+    package_manager: str,
+    dependency_file: str,
+    port: int,
+    start_command: str,
+    build_command: Optional[str],
+    base_image: Optional[str],
+) -> str:
+    """Builds the detailed, best-practice prompt for the model."""
+
+    # Collect the pieces in a list and join once, rather than growing the
+    # string with repeated concatenation.
+    parts: List[str] = [
+        _PROMPT_HEADER_TMPL.format(
+            language=language,
+            package_manager=package_manager,
+            dependency_file=dependency_file,
+            port=port,
+            start_command=start_command,
+        )
+    ]
+
+    # Add optional fields if they were provided
+    if build_command:
+        parts.append(f"- The build command is `{build_command}`.\n")
+
+    if base_image:
+        parts.append(f"- The user has requested a base image of `{base_image}`. Use this if it is a valid and secure choice, otherwise select a suitable slim or alpine official image.\n")
+
+    # Finish with the best-practice instructions
+    parts.append(_PROMPT_FOOTER)
+    return "".join(parts)
@@ -0,0 +1,93 @@
+# semantic_cache.py
+
+"""Embedding-based cache for generated Dockerfiles.
+
+Structurally similar requests (e.g. the same stack on a different port)
+produce near-identical Dockerfiles, so after an exact-match cache miss we
+look up the nearest previously seen prompt by cosine similarity and, if it
+is close enough, reuse its Dockerfile with the changed fields substituted
+in. Embedding plus nearest-neighbor search costs orders of magnitude less
+than a full model generation.
+
+This module needs `sentence-transformers`, `faiss-cpu`, and `numpy`; the
+caller is expected to treat an ImportError as "semantic caching disabled".
+"""
+
+from collections import OrderedDict
+
+import faiss
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+# Minimum cosine similarity between prompts before a cached Dockerfile is
+# considered reusable.
+_SIMILARITY_THRESHOLD = 0.95
+
+# Default entry cap; callers layering this under another cache should pass
+# that cache's size so both layers have matching retention.
+_MAX_ENTRIES = 1024
+
+# Small, fast local embedding model (~80MB, downloaded on first use).
+_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Indices into the request-field tuple stored with each entry. Only fields
+# that can be safely text-substituted into a cached Dockerfile are swapped;
+# a language or package-manager change should never pass the similarity
+# threshold in the first place.
+_FIELD_DEPENDENCY_FILE = 2
+_FIELD_PORT = 3
+_FIELD_START_COMMAND = 4
+_SUBSTITUTABLE_FIELDS = (_FIELD_DEPENDENCY_FILE, _FIELD_PORT, _FIELD_START_COMMAND)
+
+
+class SemanticCache:
+    """Nearest-neighbor cache of (prompt, request fields, Dockerfile).
+
+    All methods are synchronous and do real CPU work (embedding inference);
+    async callers should run them in a worker thread.
+    """
+
+    def __init__(self, threshold: float = _SIMILARITY_THRESHOLD, max_entries: int = _MAX_ENTRIES):
+        self._encoder = SentenceTransformer(_EMBEDDING_MODEL)
+        dimension = self._encoder.get_sentence_embedding_dimension()
+        # Inner-product over normalized embeddings == cosine similarity. The
+        # ID map lets us evict the oldest entry so the index stays bounded
+        # instead of growing for the life of the process.
+        self._index = faiss.IndexIDMap(faiss.IndexFlatIP(dimension))
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()  # id -> (fields, dockerfile)
+        self._next_id = 0
+        self._threshold = threshold
+        self._max_entries = max_entries
+
+    def _embed(self, prompt: str):
+        vector = self._encoder.encode([prompt], normalize_embeddings=True)
+        return np.asarray(vector, dtype="float32")
+
+    def get(self, prompt: str, fields: tuple):
+        """Returns an adapted cached Dockerfile, or None on a miss."""
+        if not self._entries:
+            return None
+        scores, ids = self._index.search(self._embed(prompt), 1)
+        if ids[0][0] == -1 or scores[0][0] < self._threshold:
+            return None
+        cached_fields, dockerfile = self._entries[int(ids[0][0])]
+        return _substitute_fields(dockerfile, cached_fields, fields)
+
+    def put(self, prompt: str, fields: tuple, dockerfile: str) -> None:
+        """Stores a freshly generated Dockerfile, evicting the oldest at capacity."""
+        entry_id = self._next_id
+        self._next_id += 1
+        self._index.add_with_ids(self._embed(prompt), np.asarray([entry_id], dtype="int64"))
+        self._entries[entry_id] = (fields, dockerfile)
+        if len(self._entries) > self._max_entries:
+            oldest_id, _ = self._entries.popitem(last=False)
+            self._index.remove_ids(np.asarray([oldest_id], dtype="int64"))
+
+
+def _substitute_fields(dockerfile: str, cached_fields: tuple, fields: tuple) -> str:
+    """Swaps the request fields that differ into the cached Dockerfile."""
+    for position in _SUBSTITUTABLE_FIELDS:
+        old, new = cached_fields[position], fields[position]
+        if old != new and old:
+            dockerfile = dockerfile.replace(str(old), str(new))
+    return dockerfile